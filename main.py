@@ -1,15 +1,94 @@
-from flask import Flask, render_template, request, flash, redirect, url_for, session
+from flask import Flask, render_template, request, flash, redirect, url_for, session, make_response
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
+import hashlib
 import os
+import tempfile
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from flask_sqlalchemy import SQLAlchemy
+try:
+    import redis
+except ImportError:  # Redis ist optional; ohne das Paket wird das Dashboard nicht gecacht.
+    redis = None
+try:
+    from flask_session import Session
+except ImportError:  # Ohne Flask-Session bleiben die Sessions im signierten Cookie.
+    Session = None
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import joinedload
 
 # --- Initialisierung der App und Konfiguration ---
 app = Flask(__name__)
-app.config['SECRET_KEY'] = os.urandom(24)  # Generiert einen zufälligen Secret Key. Wichtig für Sessions.
+
+SECRET_KEY_LENGTH = 24  # Länge des automatisch erzeugten Secret Keys in Bytes.
+
+def _read_secret_key(key_path):
+    """Liest einen gespeicherten Secret Key.
+
+    Args:
+        key_path (str): Pfad zur Schlüsseldatei.
+
+    Returns:
+        bytes: Der Schlüssel oder None, wenn die Datei fehlt oder leer ist.
+    """
+    try:
+        with open(key_path, 'rb') as key_file:
+            secret_key = key_file.read()
+    except FileNotFoundError:
+        return None
+    return secret_key or None  # Auch kurze, selbst hinterlegte Schlüssel bleiben gültig.
+
+def _load_secret_key():
+    """Liefert den Secret Key für die Sessions.
+
+    Bevorzugt wird die Umgebungsvariable SECRET_KEY. Fehlt sie (z.B. in der Entwicklung), wird ein
+    zufälliger Schlüssel einmalig im Instanzordner gespeichert und danach wiederverwendet, damit
+    Sessions Neustarts überstehen und alle Worker denselben Schlüssel nutzen.
+
+    Returns:
+        str | bytes: Der Secret Key.
+    """
+    secret_key = os.environ.get('SECRET_KEY')
+    if secret_key:
+        return secret_key
+
+    key_path = os.path.join(app.instance_path, 'secret_key')
+    secret_key = _read_secret_key(key_path)
+    if secret_key:
+        return secret_key
+
+    # Schlüssel zuerst vollständig in eine temporäre Datei schreiben und erst dann an seinen Platz
+    # bringen, damit andere Worker nie eine leere oder halb geschriebene Datei lesen.
+    os.makedirs(app.instance_path, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=app.instance_path)  # Wird mit Rechten 0600 angelegt.
+    try:
+        with os.fdopen(fd, 'wb') as key_file:
+            key_file.write(os.urandom(SECRET_KEY_LENGTH))
+        try:
+            os.link(tmp_path, key_path)  # Atomar; schlägt fehl, wenn ein anderer Worker schneller war.
+        except FileExistsError:
+            # Eine leere Datei kann nur von einem früheren, nicht atomaren Schreibvorgang stammen und
+            # wird ersetzt; jede nicht leere Datei bleibt unangetastet.
+            if os.path.getsize(key_path) == 0:
+                os.replace(tmp_path, key_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    # Immer den Schlüssel auf der Platte verwenden, falls ein anderer Worker ihn zuerst ersetzt hat.
+    return _read_secret_key(key_path)
+
+app.config['SECRET_KEY'] = _load_secret_key()  # Wichtig für Sessions; bleibt über Neustarts hinweg gleich.
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///notenverwaltung.db'  # Definiert den Pfad zur SQLite-Datenbank.
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False  # Deaktiviert das Tracking von Objektänderungen in SQLAlchemy.
+# Verbindungen werden über Requests hinweg wiederverwendet, damit der SQLite-Seitencache warm bleibt.
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'connect_args': {'check_same_thread': False},  # Gepoolte Verbindungen wechseln zwischen Threads.
+}
+
+app.config['REDIS_URL'] = os.environ.get('REDIS_URL')  # z.B. redis://localhost:6379/0, leer = kein Cache
+app.config['DASHBOARD_CACHE_TTL'] = 60  # Sekunden, nach denen ein gecachtes Dashboard verfällt.
 
 # --- Initialisierung von Flask-Login ---
 login_manager = LoginManager()
@@ -19,6 +98,34 @@ login_manager.login_view = 'login'  # Definiert die Route für den Login-View.
 # --- Initialisierung von SQLAlchemy ---
 db = SQLAlchemy(app)
 
+def _sqlite_pragmas(dbapi_conn, _):
+    """Setzt die SQLite-PRAGMAs für jede neu geöffnete Datenbankverbindung.
+
+    WAL erlaubt Lesezugriffe parallel zu Schreibzugriffen, synchronous=NORMAL spart
+    einen fsync pro Commit, und der größere Cache hält häufig gelesene Seiten im RAM.
+    foreign_keys=ON schaltet die Prüfung der Fremdschlüssel für alle Schreibzugriffe ein;
+    nur dann führt SQLite ON DELETE CASCADE aus.
+    """
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-20000")  # Negativer Wert = Größe in KiB (ca. 20 MB).
+    cursor.execute("PRAGMA foreign_keys=ON")  # Nötig, damit SQLite ON DELETE CASCADE ausführt.
+    cursor.close()
+
+with app.app_context():
+    event.listen(db.engine, 'connect', _sqlite_pragmas)
+
+# --- Initialisierung von Redis (optional) ---
+redis_client = redis.Redis.from_url(app.config['REDIS_URL']) if redis and app.config['REDIS_URL'] else None
+
+# Sessions in Redis ablegen, damit das Cookie nur noch die Session-ID enthält.
+if redis_client is not None and Session is not None:
+    app.config['SESSION_TYPE'] = 'redis'
+    app.config['SESSION_REDIS'] = redis_client
+    Session(app)
+
 # --- Benutzerdefinierte Jinja-Filter ---
 
 # Filter, um Aufzählungen in Jinja-Templates zu ermöglichen.
@@ -27,6 +134,39 @@ app.jinja_env.filters['enumerate'] = enumerate
 # Filter, um Zeitstempel in Jinja-Templates zu formatieren.
 app.jinja_env.filters['strftime'] = lambda dt, fmt: dt.strftime(fmt) if dt else ''
 
+def parse_iso(value):
+    """Wandelt einen ISO-Datumsstring (JJJJ-MM-TT) in ein date-Objekt um.
+
+    Args:
+        value: Der zu parsende String.
+
+    Returns:
+        date: Das Datum oder None, wenn der Wert leer oder ungültig ist.
+    """
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+def parse_form_date(value):
+    """Wandelt ein Datum aus einem Formular um.
+
+    Args:
+        value: Der Formularwert.
+
+    Returns:
+        date: Das Datum oder None, wenn das Feld leer ist.
+
+    Raises:
+        ValueError: Wenn ein Wert angegeben, aber kein gültiges ISO-Datum ist.
+    """
+    parsed = parse_iso(value)
+    if value and parsed is None:
+        raise ValueError(f"Ungültiges Datum: {value}")
+    return parsed
+
 # Filter, um ein Datum in einem bestimmten Format auszugeben.
 @app.template_filter('date_format')
 def date_format(value, format='%d.%m.%Y'):
@@ -41,12 +181,56 @@ def date_format(value, format='%d.%m.%Y'):
     """
     if value is None:
         return ""
-    try:
-        if isinstance(value, str):
-            value = datetime.strptime(value, '%Y-%m-%d')  # Konvertiert String zu datetime-Objekt.
-        return value.strftime(format)
-    except ValueError:
+    parsed = parse_iso(value) if isinstance(value, str) else value  # Konvertiert String zu date-Objekt.
+    if parsed is None:
         return value
+    return parsed.strftime(format)
+
+# --- Konstanten ---
+THREE_YEARS = timedelta(days=3 * 365)  # Angenommene Studiendauer für das Gesamtziel.
+SIX_MONTHS = timedelta(days=180)  # Angenommene Dauer eines Semesters.
+PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'  # Explizit festgelegt statt vom Werkzeug-Standard abhängig.
+
+# Farben der Fortschrittsbalken je Zielklasse; unbekannte Klassen werden rot dargestellt.
+COLOR_MAP = {
+    'ziel-erreicht': '#4CAF50',  # Grün
+    'ziel-gefaehrdet': '#ff9800',  # Orange
+    'ziel-verfehlt': '#f44336',  # Rot
+}
+DEFAULT_COLOR = COLOR_MAP['ziel-verfehlt']
+
+# Kompiliertes Dashboard-Template einmalig laden, statt es bei jedem Request über den Loader aufzulösen.
+DASHBOARD_TEMPLATE = app.jinja_env.get_template('dashboard.html')
+
+def _dashboard_code_version():
+    """Bildet einen Hash über den Quelltext von dashboard.html und dieses Moduls.
+
+    Fließt in das ETag ein, damit Browser und Redis-Cache nach einem Deployment mit geändertem
+    Template oder geänderter Berechnungslogik keine veralteten Seiten mehr ausliefern.
+
+    Returns:
+        str: Der Versions-Hash.
+    """
+    template_source, _, _ = app.jinja_loader.get_source(app.jinja_env, 'dashboard.html')
+    digest = hashlib.sha1(template_source.encode())
+    with open(__file__, 'rb') as module_file:
+        digest.update(module_file.read())
+    return digest.hexdigest()
+
+DASHBOARD_VERSION = _dashboard_code_version()
+
+def _dashboard_template():
+    """Liefert das Dashboard-Template.
+
+    Ist das automatische Neuladen von Templates aktiv (Debug-Modus oder TEMPLATES_AUTO_RELOAD),
+    wird das Template pro Request aufgelöst, damit Änderungen an dashboard.html sofort greifen.
+
+    Returns:
+        Template: Das Dashboard-Template.
+    """
+    if app.jinja_env.auto_reload:
+        return app.jinja_env.get_template('dashboard.html')
+    return DASHBOARD_TEMPLATE
 
 # --- Datenbank-Modelle ---
 
@@ -61,7 +245,7 @@ class User(UserMixin, db.Model):
     """
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128))
+    password_hash = db.Column(db.String(256))  # scrypt-Hashes sind länger als 128 Zeichen.
 
     def check_password(self, password):
         """Überprüft, ob das angegebene Passwort mit dem gehashten Passwort des Benutzers übereinstimmt.
@@ -82,11 +266,15 @@ class Major(db.Model):
         id (int): Der eindeutige Identifikator des Studiengangs (Primärschlüssel).
         name (str): Der Name des Studiengangs.
         user_id (int): Die ID des Benutzers, dem der Studiengang zugeordnet ist (Fremdschlüssel).
+        updated_at (DateTime): Zeitpunkt der letzten Änderung.
     """
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     user = db.relationship('User', backref=db.backref('majors', lazy=True))  # Verknüpfung zum User
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (db.Index('ix_major_user', 'user_id'),)
 
 class Semester(db.Model):
     """
@@ -96,21 +284,26 @@ class Semester(db.Model):
         id (int): Der eindeutige Identifikator des Semesters (Primärschlüssel).
         name (str): Der Name des Semesters (z.B. "WS2023", "SoSe2024").
         date (Date): Das Datum des Semesters (z.B. Startdatum).
-        target_date (str): Das angestrebte Zieldatum für den Abschluss des Semesters.
+        target_date (Date): Das angestrebte Zieldatum für den Abschluss des Semesters.
         target_grade (float): Die angestrebte Zielnote für das Semester.
         major_id (int): Die ID des Studiengangs, zu dem das Semester gehört (Fremdschlüssel).
         user_id (int): Die ID des Benutzers, dem das Semester zugeordnet ist (Fremdschlüssel).
+        updated_at (DateTime): Zeitpunkt der letzten Änderung.
     """
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
     date = db.Column(db.Date)
-    target_date = db.Column(db.String(20))
+    target_date = db.Column(db.Date)
     target_grade = db.Column(db.Float)
     major_id = db.Column(db.Integer, db.ForeignKey('major.id'), nullable=False)
     major = db.relationship('Major', backref=db.backref('semesters', lazy=True))  # Verknüpfung zum Major
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     user = db.relationship('User', backref=db.backref('semesters', lazy=True))  # Verknüpfung zum User
-    modules = db.relationship('Module', backref='semester', lazy=True)  # Verknüpfung zu den Modulen
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    modules = db.relationship('Module', backref='semester', lazy='selectin',
+                              cascade='all, delete-orphan', passive_deletes=True)  # Verknüpfung zu den Modulen, werden mit dem Semester gelöscht
+
+    __table_args__ = (db.Index('ix_semester_user', 'user_id'),)
 
 class Module(db.Model):
     """
@@ -124,19 +317,79 @@ class Module(db.Model):
         date (Date): Das Datum, an dem das Modul abgeschlossen wurde.
         semester_id (int): Die ID des Semesters, zu dem das Modul gehört (Fremdschlüssel).
         user_id (int): Die ID des Benutzers, dem das Modul zugeordnet ist (Fremdschlüssel).
+        updated_at (DateTime): Zeitpunkt der letzten Änderung.
     """
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     ects = db.Column(db.Integer)
     grade = db.Column(db.Float)
     date = db.Column(db.Date)
-    semester_id = db.Column(db.Integer, db.ForeignKey('semester.id'), nullable=False)
+    semester_id = db.Column(db.Integer, db.ForeignKey('semester.id', ondelete='CASCADE'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     user = db.relationship('User', backref=db.backref('modules', lazy=True))  # Verknüpfung zum User
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_module_user_semester', 'user_id', 'semester_id'),
+        db.Index('ix_module_semester', 'semester_id'),
+    )
 
 # --- Datenbank-Initialisierung ---
-with app.app_context():
-    db.create_all()  # Erstellt die Datenbanktabellen, falls sie noch nicht existieren.
+
+def _normalize_semester_target_dates():
+    """Bereinigt Zieldaten, die noch aus der Zeit als Textspalte stammen.
+
+    Früher wurde der Formularwert unverändert gespeichert, also auch leere Strings oder Daten wie
+    "2024-1-5". Solche Werte kann der Date-Typ nicht lesen. Erkennbare Daten werden ins ISO-Format
+    überführt, alle anderen auf NULL gesetzt.
+    """
+    with db.engine.begin() as connection:
+        rows = connection.execute(db.text(
+            "SELECT id, target_date FROM semester WHERE target_date IS NOT NULL")).all()
+        for semester_id, raw_value in rows:
+            raw_value = str(raw_value).strip()
+            parsed = parse_iso(raw_value)
+            for legacy_format in ('%Y-%m-%d', '%d.%m.%Y'):
+                if parsed is not None:
+                    break
+                try:
+                    parsed = datetime.strptime(raw_value, legacy_format).date()
+                except ValueError:
+                    pass
+            normalized = parsed.isoformat() if parsed else None
+            if normalized != raw_value:
+                connection.execute(db.text("UPDATE semester SET target_date = :target_date WHERE id = :id"),
+                                   {'target_date': normalized, 'id': semester_id})
+
+def _upgrade_database():
+    """Erstellt die Datenbanktabellen und bringt bestehende Datenbanken auf den aktuellen Stand.
+
+    Fehlende Spalten und Indizes werden auch in bereits bestehenden Datenbanken angelegt und
+    ungültige Zieldaten bereinigt. Muss innerhalb eines App-Kontexts aufgerufen werden.
+    """
+    db.create_all()
+    # create_all() ergänzt keine neuen Spalten in vorhandenen Tabellen, daher optionale Spalten nachziehen.
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns and column.nullable:
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                with db.engine.begin() as connection:
+                    connection.execute(db.text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+    # create_all() überspringt vorhandene Tabellen samt ihrer Indizes, daher einzeln nachziehen.
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+    _normalize_semester_target_dates()
+
+@app.cli.command('init-db')
+def init_db():
+    """Erstellt die Datenbanktabellen bzw. aktualisiert eine bestehende Datenbank.
+
+    Einmalig vor dem ersten Start (und nach Updates) ausführen: `flask --app main init-db`.
+    """
+    _upgrade_database()
 
 # --- Benutzer-Login-Funktionen ---
 
@@ -173,7 +426,7 @@ def register():
             return render_template('register.html')
 
         # Erstellt einen neuen Benutzer und speichert ihn in der Datenbank.
-        hashed_password = generate_password_hash(password)  # Das Passwort wird gehasht.
+        hashed_password = generate_password_hash(password, method=PASSWORD_HASH_METHOD)  # Das Passwort wird gehasht.
         new_user = User(username=username, password_hash=hashed_password)
         db.session.add(new_user)
         db.session.commit()
@@ -207,25 +460,107 @@ def login():
 
 # --- Dashboard-Funktionen ---
 
-def calculate_weighted_average(modules):
-    """Berechnet den gewichteten Notendurchschnitt für eine Liste von Modulen.
+def _load_semesters():
+    """Lädt alle Semester des aktuellen Benutzers inklusive ihrer Module.
+
+    Die Module werden per JOIN in derselben Abfrage mitgeladen, damit beim Iterieren
+    über `semester.modules` keine zusätzliche Abfrage pro Semester entsteht.
+
+    Returns:
+        list: Die Semester des Benutzers, sortiert nach ihrer ID.
+    """
+    return (Semester.query
+            .options(joinedload(Semester.modules))
+            .filter_by(user_id=current_user.id)
+            .order_by(Semester.id)
+            .all())
+
+def _dashboard_cache_key(etag):
+    """Bildet den Redis-Schlüssel für das gerenderte Dashboard.
+
+    Der Schlüssel basiert auf dem ETag der Seite, das bereits Benutzer, Datenstand und die
+    Ansichtseinstellungen aus der Session enthält. Jede Änderung führt so automatisch zu einem
+    neuen Schlüssel, ohne dass der Cache explizit verworfen werden muss.
 
     Args:
-        modules (list): Eine Liste von Modul-Objekten.
+        etag (str): Das ETag des Dashboards.
 
     Returns:
-        float: Der gewichtete Notendurchschnitt oder None, wenn keine Module mit Noten vorhanden sind.
-    """
-    weighted_sum = 0
-    total_ects = 0
-    for module in modules:
-        if module.grade is not None:
-            weighted_sum += module.grade * module.ects
-            total_ects += module.ects
-    if total_ects > 0:
-        return weighted_sum / total_ects
-    else:
+        str: Der Cache-Schlüssel oder None, wenn kein Redis verfügbar ist.
+    """
+    if redis_client is None:
         return None
+    return f"dash:{etag}"
+
+def _dashboard_etag(edit_mode, today):
+    """Bildet ein ETag, das sich ändert, sobald sich der Inhalt des Dashboards ändern würde.
+
+    Berücksichtigt werden die Änderungszeitpunkte und Anzahlen der Module, Semester und des
+    Studiengangs, die Ansichtseinstellungen aus der Session, das aktuelle Datum, da die
+    Zeitfortschritts-Meldungen davon abhängen, sowie die Version von Template und Code.
+
+    Args:
+        edit_mode (bool): Ob das Dashboard im Bearbeitungsmodus angezeigt wird.
+        today (date): Das Datum des aktuellen Requests.
+
+    Returns:
+        str: Das ETag.
+    """
+    user_id = current_user.id
+    version = db.session.query(
+        db.session.query(db.func.max(Module.updated_at)).filter(Module.user_id == user_id).scalar_subquery(),
+        db.session.query(db.func.count(Module.id)).filter(Module.user_id == user_id).scalar_subquery(),
+        db.session.query(db.func.max(Semester.updated_at)).filter(Semester.user_id == user_id).scalar_subquery(),
+        db.session.query(db.func.count(Semester.id)).filter(Semester.user_id == user_id).scalar_subquery(),
+        db.session.query(db.func.max(Major.updated_at)).filter(Major.user_id == user_id).scalar_subquery(),
+    ).one()
+    # Bei aktivem Template-Neuladen kann sich dashboard.html jederzeit ändern, daher neu berechnen.
+    code_version = _dashboard_code_version() if app.jinja_env.auto_reload else DASHBOARD_VERSION
+    state = (code_version, user_id, tuple(version), edit_mode, session.get('overall_target_date'),
+             session.get('overall_target_grade'), today)
+    return hashlib.sha1(repr(state).encode()).hexdigest()
+
+def _conditional_response(body, etag):
+    """Erstellt die Antwort und beantwortet sie mit 304, wenn der Client das ETag bereits kennt.
+
+    Args:
+        body: Der Inhalt der Antwort.
+        etag (str): Das ETag der Seite oder None, wenn die Seite nicht wiederverwendet werden darf.
+
+    Returns:
+        Response: Die (ggf. bedingte) Antwort.
+    """
+    response = make_response(body)
+    if etag:
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'  # Browser muss jedes Mal per ETag nachfragen.
+        response = response.make_conditional(request)
+    return response
+
+def calculate_weighted_averages():
+    """Berechnet die gewichteten Notendurchschnitte des aktuellen Benutzers direkt in der Datenbank.
+
+    Returns:
+        tuple: Ein Dictionary mit dem Durchschnitt je Semester-ID, ein Dictionary, das je Semester-ID
+               angibt, ob alle Module benotet sind, und den Gesamtdurchschnitt.
+               Ohne benotete Module ist der jeweilige Durchschnitt None.
+    """
+    rows = db.session.query(
+        Module.semester_id,
+        db.func.sum(Module.grade * Module.ects),
+        db.func.sum(db.case((Module.grade.isnot(None), Module.ects))),
+        db.func.count(Module.id) - db.func.count(Module.grade),  # Anzahl unbenoteter Module
+        db.func.count(Module.id),
+    ).filter(Module.user_id == current_user.id).group_by(Module.semester_id).all()
+
+    averages = {semester_id: (weighted_sum / ects if ects else None)
+                for semester_id, weighted_sum, ects, _, _ in rows}
+    all_graded = {semester_id: null_count == 0 and total_count > 0
+                  for semester_id, _, _, null_count, total_count in rows}
+    total_weighted_sum = sum(weighted_sum or 0 for _, weighted_sum, _, _, _ in rows)
+    total_ects = sum(ects or 0 for _, _, ects, _, _ in rows)
+    total_average = total_weighted_sum / total_ects if total_ects > 0 else None
+    return averages, all_graded, total_average
 
 @app.route('/dashboard', methods=['GET', 'POST'])
 @login_required
@@ -233,20 +568,42 @@ def dashboard():
     """
     Route für das Dashboard des Benutzers.
     """
+    # Aktuelle Zeit einmal pro Request bestimmen, damit alle Berechnungen denselben Zeitpunkt nutzen
+    now = datetime.now()
+    today = now.date()
+
     # Bearbeitungsmodus aus der Session laden (Standard: False)
     edit_mode = session.get('edit_mode', False)
 
+    # Unverändertes oder gecachtes Dashboard ausliefern, sofern keine Flash-Nachrichten anstehen
+    # (die sonst verloren gingen)
+    cache_key = None
+    etag = None
+    if request.method == 'GET' and '_flashes' not in session:
+        etag = _dashboard_etag(edit_mode, today)
+        if request.if_none_match.contains_weak(etag):
+            return _conditional_response('', etag)
+
+        cache_key = _dashboard_cache_key(etag)
+        if cache_key:
+            try:
+                cached = redis_client.get(cache_key)
+            except redis.RedisError:
+                cached = None
+            if cached is not None:
+                return _conditional_response(cached, etag)
+
     # Daten des aktuellen Benutzers aus der Datenbank laden
     major = Major.query.filter_by(user_id=current_user.id).first()
-    semesters = Semester.query.filter_by(user_id=current_user.id).all()
+    semesters = _load_semesters()
 
     # Initialisiere semesters mit einem Beispiel, falls keine vorhanden.
     if not semesters:
-        default_major = Major.query.filter_by(user_id=current_user.id).first()
-        if not default_major:
-            default_major = Major(name="Dein Studiengang", user_id=current_user.id)
-            db.session.add(default_major)
-            db.session.commit()
+        # Den bereits geladenen Studiengang wiederverwenden und nur bei Bedarf anlegen
+        if not major:
+            major = Major(name="Dein Studiengang", user_id=current_user.id)
+            db.session.add(major)
+            db.session.flush()  # Vergibt die ID, ohne die Transaktion abzuschließen.
 
         # Beispieldaten
         semester1 = {
@@ -256,11 +613,10 @@ def dashboard():
                 {"name": "Mathematik 1", "ects": 6, "grade": 1.7, "date": datetime(2023, 10, 26)},
                 {"name": "Informatik 1", "ects": 6, "grade": 2.3, "date": datetime(2023, 11, 15)},
             ],
-            "target_date": (datetime.now() + timedelta(days=3*365)).strftime('%Y-%m-%d'),
+            "target_date": (now + THREE_YEARS).date(),
             "target_grade": 2.0,
-            "major_id": default_major.id
+            "major_id": major.id
         }
-        semesters.append(semester1)
 
         # Konvertiert die Beispieldaten in Datenbankobjekte
         semester1_db = Semester(
@@ -268,29 +624,30 @@ def dashboard():
             date=semester1["date"],
             target_date=semester1["target_date"],
             target_grade=semester1["target_grade"],
-            major_id=default_major.id,
+            major_id=major.id,
             user_id=current_user.id
         )
         db.session.add(semester1_db)
-        db.session.commit()
+        db.session.flush()
 
-        for module_data in semester1["modules"]:
-            module_db = Module(
-                name=module_data["name"],
-                ects=module_data["ects"],
-                grade=module_data["grade"],
-                date=module_data["date"],
-                semester_id=semester1_db.id,
-                user_id=current_user.id
-            )
-            db.session.add(module_db)
-        db.session.commit()
+        # Alle Module mit einem einzigen INSERT-Statement anlegen
+        db.session.bulk_insert_mappings(Module, [
+            {"name": module_data["name"], "ects": module_data["ects"], "grade": module_data["grade"],
+             "date": module_data["date"], "semester_id": semester1_db.id,
+             "user_id": current_user.id}
+            for module_data in semester1["modules"]
+        ])
+        db.session.commit()  # Studiengang, Semester und Module in einer Transaktion speichern.
 
         # Aktualisiere die semesters-Variable, um die Datenbankobjekte zu verwenden
-        semesters = Semester.query.filter_by(user_id=current_user.id).all()
+        semesters = _load_semesters()
+
+        # Das ETag beschreibt noch den Stand vor dem Anlegen der Beispieldaten
+        cache_key = None
+        etag = None
 
     # Ziele aus der Session laden (Standardwerte, falls nicht gesetzt)
-    overall_target_date_str = session.get('overall_target_date', (datetime.now() + timedelta(days=3 * 365)).strftime('%Y-%m-%d'))
+    overall_target_date_str = session.get('overall_target_date', (now + THREE_YEARS).strftime('%Y-%m-%d'))
     overall_target_grade = session.get('overall_target_grade', 2.0)
 
     if request.method == 'POST':
@@ -299,13 +656,13 @@ def dashboard():
             # Logik zum Speichern von Änderungen an Studiengang, Semestern und Modulen.
             if 'update_major' in request.form:
                 major_name = request.form.get('major')
-                major = Major.query.filter_by(user_id=current_user.id).first()
                 if major:
                     major.name = major_name
                 else:
                     major = Major(name=major_name, user_id=current_user.id)
                     db.session.add(major)
                 db.session.commit()
+                return redirect(url_for('dashboard'))
             
             semester_index = -1
             if 'semester_index' in request.form:
@@ -321,33 +678,35 @@ def dashboard():
                 
             # --- Semester hinzufügen ---
             if 'add_semester' in request.form:
-                semester_name = request.form.get('semester_name')
-                semester_date_str = request.form.get('semester_date')
-                # Konvertiert das Datum von String zu Date Objekt
-                semester_date = datetime.strptime(semester_date_str, '%Y-%m-%d') if semester_date_str else None
-                # Setzt das Zieldatum auf 6 Monate in der Zukunft, könnte aber beliebig geändert werden
-                target_date_str = (datetime.now() + timedelta(days=180)).strftime('%Y-%m-%d')
-
-                if semester_name:
-                    major = Major.query.filter_by(user_id=current_user.id).first()
-                    new_semester = Semester(name=semester_name, date=semester_date, target_date=target_date_str, target_grade=2.5, major_id=major.id, user_id=current_user.id)
-                    db.session.add(new_semester)
-                    db.session.commit()
-                    semesters = Semester.query.filter_by(user_id=current_user.id).all()
+                try:
+                    semester_name = request.form.get('semester_name')
+                    # Konvertiert das Datum von String zu Date Objekt
+                    semester_date = parse_form_date(request.form.get('semester_date'))
+                    # Setzt das Zieldatum auf 6 Monate in der Zukunft, könnte aber beliebig geändert werden
+                    target_date = (now + SIX_MONTHS).date()
+
+                    if semester_name:
+                        new_semester = Semester(name=semester_name, date=semester_date, target_date=target_date, target_grade=2.5, major_id=major.id, user_id=current_user.id)
+                        db.session.add(new_semester)
+                        db.session.commit()
+                        return redirect(url_for('dashboard'))
+
+                except ValueError as e:
+                    flash(f"Fehler beim Hinzufügen des Semesters: {e}", "danger")
 
             # --- Modul hinzufügen ---
             elif 'add_module' in request.form:
                 try:
                     module_name = request.form.get('module_name')
                     ects = int(request.form.get('ects'))
-                    date_str = request.form.get('date')
                     # Konvertiert das Datum von String zu Date Objekt
-                    date = datetime.strptime(date_str, '%Y-%m-%d') if date_str else None
+                    module_date = parse_form_date(request.form.get('date'))
                     semester = semesters[semester_index]
                     if module_name and ects > 0:
-                        new_module = Module(name=module_name, ects=ects, grade=None, date=date, semester_id=semester.id, user_id=current_user.id)
+                        new_module = Module(name=module_name, ects=ects, grade=None, date=module_date, semester_id=semester.id, user_id=current_user.id)
                         db.session.add(new_module)
-                        db.session.commit() semesters = Semester.query.filter_by(user_id=current_user.id).all()
+                        db.session.commit()
+                        return redirect(url_for('dashboard'))
                     else:
                         flash("Bitte geben Sie einen Modulnamen und ECTS größer 0 ein.", "danger")
                 except (ValueError, IndexError):
@@ -360,9 +719,8 @@ def dashboard():
                     module_name = request.form.get('module_name')
                     ects = int(request.form.get('ects'))
                     grade = request.form.get('grade')
-                    date_str = request.form.get('date')
                     # Konvertiert das Datum von String zu Date Objekt
-                    date = datetime.strptime(date_str, '%Y-%m-%d') if date_str else None
+                    module_date = parse_form_date(request.form.get('date'))
 
                     # Note in float umwandeln oder auf None setzen
                     if grade:
@@ -376,9 +734,9 @@ def dashboard():
                         module.name = module_name
                         module.ects = ects
                         module.grade = grade
-                        module.date = date
+                        module.date = module_date
                         db.session.commit()
-                        semesters = Semester.query.filter_by(user_id=current_user.id).all()
+                        return redirect(url_for('dashboard'))
                     else:
                         flash("Bitte geben Sie einen Modulnamen und ECTS größer 0 ein.", "danger")
 
@@ -393,19 +751,19 @@ def dashboard():
 
                     db.session.delete(module)
                     db.session.commit()
-                    semesters = Semester.query.filter_by(user_id=current_user.id).all()
+                    return redirect(url_for('dashboard'))
                 except (ValueError, IndexError):
                     flash("Ungültige Eingabe für Semester- oder Modulindex", "danger")
 
             # --- Semester entfernen ---
             elif 'remove_semester' in request.form:
                 try:
-                    semester = semesters[semester_index]
-                    for module in semester.modules:
-                        db.session.delete(module)
-                    db.session.delete(semester)
+                    # Die Module werden per ORM-Cascade mitgelöscht. Da sie bereits geladen sind, löscht
+                    # SQLAlchemy sie gesammelt (executemany) vor dem Semester; ON DELETE CASCADE greift nur
+                    # für nicht geladene Module und nur in neu angelegten Datenbanken.
+                    db.session.delete(semesters[semester_index])
                     db.session.commit()
-                    semesters = Semester.query.filter_by(user_id=current_user.id).all()
+                    return redirect(url_for('dashboard'))
                 except (ValueError, IndexError):
                     flash("Ungültige Eingabe für Semesterindex", "danger")
 
@@ -413,15 +771,14 @@ def dashboard():
             elif 'update_semester' in request.form:
                 try:
                     semester_name = request.form.get('semester_name')
-                    semester_date_str = request.form.get('semester_date')
                     # Konvertiert das Datum von String zu Date Objekt
-                    semester_date = datetime.strptime(semester_date_str, '%Y-%m-%d') if semester_date_str else None
+                    semester_date = parse_form_date(request.form.get('semester_date'))
                     semester = semesters[semester_index]
                     if semester_name:
                         semester.name = semester_name
                         semester.date = semester_date
                         db.session.commit()
-                        semesters = Semester.query.filter_by(user_id=current_user.id).all()
+                        return redirect(url_for('dashboard'))
                     else:
                         flash("Bitte geben Sie einen Semester Name ein", "danger")
 
@@ -431,13 +788,15 @@ def dashboard():
             # --- Semesterziele aktualisieren ---
             elif 'update_semester_targets' in request.form:
                 try:
-                    target_date_str = request.form.get('target_date')
+                    target_date = parse_iso(request.form.get('target_date'))
+                    if target_date is None:
+                        raise ValueError("Ungültiges Zieldatum")
                     target_grade = float(request.form.get('target_grade'))
 
-                    semesters[semester_index].target_date = target_date_str
+                    semesters[semester_index].target_date = target_date
                     semesters[semester_index].target_grade = target_grade
                     db.session.commit()
-                    semesters = Semester.query.filter_by(user_id=current_user.id).all()
+                    return redirect(url_for('dashboard'))
                 except (ValueError, IndexError) as e:
                     flash(f"Fehler beim Aktualisieren der Semesterziele: {e}", "danger")
 
@@ -452,14 +811,12 @@ def dashboard():
 
                 session['overall_target_date'] = overall_target_date_str
                 session['overall_target_grade'] = overall_target_grade
+                return redirect(url_for('dashboard'))
 
-    # --- Durchschnitt für jedes Semester berechnen ---
+    # --- Durchschnitt für jedes Semester und Gesamtdurchschnitt berechnen ---
+    averages, all_graded, total_average = calculate_weighted_averages()
     for semester in semesters:
-        semester.average = calculate_weighted_average(semester.modules)
-
-    # --- Gesamtdurchschnitt berechnen ---
-    all_modules = [module for semester in semesters for module in semester.modules]
-    total_average = calculate_weighted_average(all_modules)
+        semester.average = averages.get(semester.id)
 
     # --- Berechnung des Fortschritts und der Farben für jedes Semester ---
     for semester in semesters:
@@ -476,17 +833,15 @@ def dashboard():
                 semester.ziel_klasse = "ziel-gefaehrdet"
 
             # Zeitfortschritt
-            try:
-                target_date = datetime.strptime(semester.target_date, '%Y-%m-%d')
-                vergangene_zeit = datetime.now() - (
-                            target_date - timedelta(days=180))  # Annahme: Startdatum = Zieldatum - 6 Monate
-                gesamte_zeit = timedelta(days=180)
-                zeit_prozent = vergangene_zeit / gesamte_zeit * 100
+            if semester.target_date is not None:
+                vergangene_zeit = today - (semester.target_date - SIX_MONTHS)  # Annahme: Startdatum = Zieldatum - 6 Monate
+                zeit_prozent = vergangene_zeit / SIX_MONTHS * 100
 
-                if zeit_prozent > 100:
+                # >= statt >, da ganze Tage gerechnet werden: Am Zieltag selbst ist die Zeit bereits abgelaufen.
+                if zeit_prozent >= 100:
                     semester.ziel_nachricht += " Achtung: Die Zeit für dieses Semester läuft ab!"
                     semester.ziel_klasse = "ziel-verfehlt"
-            except ValueError:
+            else:
                 semester.ziel_nachricht += " Fehler beim Berechnen des Zeitfortschritts."
                 semester.ziel_klasse = "ziel-verfehlt"
         else:
@@ -494,12 +849,7 @@ def dashboard():
             semester.ziel_klasse = "ziel-gefaehrdet"
 
         # Berechnung der Farbe für den Fortschrittsbalken im Semesterziel
-        if semester.ziel_klasse == "ziel-erreicht":
-            semester.fortschritt_farbe = "#4CAF50"  # Grün
-        elif semester.ziel_klasse == "ziel-gefaehrdet":
-            semester.fortschritt_farbe = "#ff9800"  # Orange
-        else:
-            semester.fortschritt_farbe = "#f44336"  # Rot
+        semester.fortschritt_farbe = COLOR_MAP.get(semester.ziel_klasse, DEFAULT_COLOR)
 
     # --- Berechnung des Fortschritts für das Gesamtziel ---
     overall_ziel_nachricht = ""
@@ -517,17 +867,15 @@ def dashboard():
             overall_fortschritt_prozent = int(
                 overall_target_grade / total_average * 100) if total_average > 0 else 0
 
-        try:
-            overall_target_date = datetime.strptime(overall_target_date_str, '%Y-%m-%d')
-            vergangene_zeit = datetime.now() - (
-                        overall_target_date - timedelta(days=3 * 365))  # Annahme: Startdatum vor 3 Jahren
-            gesamte_zeit = timedelta(days=3 * 365)
-            zeit_prozent = vergangene_zeit / gesamte_zeit * 100
+        overall_target_date = parse_iso(overall_target_date_str)
+        if overall_target_date is not None:
+            vergangene_zeit = today - (overall_target_date - THREE_YEARS)  # Annahme: Startdatum vor 3 Jahren
+            zeit_prozent = vergangene_zeit / THREE_YEARS * 100
 
-            if zeit_prozent > 100:
+            if zeit_prozent >= 100:  # Am Zieltag selbst gilt die Zeit bereits als abgelaufen.
                 overall_ziel_nachricht += " Achtung: Die Zeit für dein Studium läuft ab!"
                 overall_ziel_klasse = "ziel-verfehlt"
-        except ValueError:
+        else:
             overall_ziel_nachricht += " Fehler beim Berechnen des Zeitfortschritts."
             overall_ziel_klasse = "ziel-verfehlt"
 
@@ -536,32 +884,21 @@ def dashboard():
         overall_ziel_klasse = "ziel-gefaehrdet"
 
     # Berechnung der Farbe für den Fortschrittsbalken im Gesamtziel
-    if overall_ziel_klasse == "ziel-erreicht":
-        overall_fortschritt_farbe = "#4CAF50"  # Grün
-    elif overall_ziel_klasse == "ziel-gefaehrdet":
-        overall_fortschritt_farbe = "#ff9800"  # Orange
-    else:
-        overall_fortschritt_farbe = "#f44336"  # Rot
+    overall_fortschritt_farbe = COLOR_MAP.get(overall_ziel_klasse, DEFAULT_COLOR)
 
     # --- Überprüfen, ob ein Semester abgeschlossen wurde, und ggf. Flash-Nachricht anzeigen ---
     for semester in semesters:
         if semester.average is not None:
-            try:
-                semester_ziel_datum = datetime.strptime(semester.target_date, '%Y-%m-%d')
-            except ValueError:
-                flash(
-                    f"Ungültiges Zieldatum Format für Semester {semester.name}. Bitte verwenden Sie das Format JJJJ-MM-TT.",
-                    "danger")
-                continue  # Zum nächsten Semester springen, falls das Format ungültig ist
+            semester_ziel_datum = semester.target_date
 
             toleranz_tage = 30
-            if semester_ziel_datum is not None and datetime.now() > semester_ziel_datum + timedelta(
+            if semester_ziel_datum is not None and today >= semester_ziel_datum + timedelta(
                     days=toleranz_tage):
                 if not session.get(f'semester_{semester.id}_abgeschlossen'):
                     flash(f"Das Semester '{semester.name}' ist abgeschlossen! Durchschnittsnote: {semester.average:.2f}",
                           "success")
                     session[f'semester_{semester.id}_abgeschlossen'] = True
-            elif all(module.grade is not None for module in semester.modules):
+            elif all_graded.get(semester.id, False):
                 if not session.get(f'semester_{semester.id}_abgeschlossen'):
                     flash(f"Das Semester '{semester.name}' ist abgeschlossen! Durchschnittsnote: {semester.average:.2f}",
                           "success")
@@ -570,13 +907,25 @@ def dashboard():
                 # Zurücksetzen des Flags, falls das Semester noch nicht abgeschlossen ist
                 session[f'semester_{semester.id}_abgeschlossen'] = False
 
-    return render_template('dashboard.html', semesters=semesters, total_average=total_average,
-                           edit_mode=edit_mode, major=major, current_user=current_user,
-                           overall_target_date_str=overall_target_date_str,
-                           overall_target_grade=overall_target_grade,
-                           overall_ziel_nachricht=overall_ziel_nachricht, overall_ziel_klasse=overall_ziel_klasse,
-                           overall_fortschritt_prozent=overall_fortschritt_prozent,
-                           overall_fortschritt_farbe=overall_fortschritt_farbe)
+    # Seiten mit Flash-Nachrichten nicht cachen, sonst würden die Nachrichten erneut angezeigt.
+    cacheable = cache_key is not None and '_flashes' not in session
+    if '_flashes' in session:
+        etag = None
+
+    rendered = render_template(_dashboard_template(), semesters=semesters, total_average=total_average,
+                               edit_mode=edit_mode, major=major, current_user=current_user,
+                               overall_target_date_str=overall_target_date_str,
+                               overall_target_grade=overall_target_grade,
+                               overall_ziel_nachricht=overall_ziel_nachricht, overall_ziel_klasse=overall_ziel_klasse,
+                               overall_fortschritt_prozent=overall_fortschritt_prozent,
+                               overall_fortschritt_farbe=overall_fortschritt_farbe)
+
+    if cacheable:
+        try:
+            redis_client.setex(cache_key, app.config['DASHBOARD_CACHE_TTL'], rendered)
+        except redis.RedisError:
+            pass
+    return _conditional_response(rendered, etag)
 
 @app.route('/toggle_edit_mode')
 @login_required
@@ -597,4 +946,7 @@ def logout():
     return redirect(url_for('login'))
 
 if __name__ == '__main__':
+    # Im Entwicklungsmodus die Datenbank direkt vorbereiten, damit kein separates `init-db` nötig ist.
+    with app.app_context():
+        _upgrade_database()
     app.run(debug=True)
\ No newline at end of file